@@ -31,7 +31,9 @@ from .models import Quiz, Question, QuestionOption, QuizAttempt, AttemptAnswer
 
 class CourseViewSet(viewsets.ModelViewSet):
     """ViewSet for course management."""
-    queryset = Course.objects.active().select_related('instructor')
+    queryset = Course.objects.active().select_related(
+        'instructor', 'instructor__teacher_admin_profile'
+    )
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'category', 'difficulty_level', 'instructor']
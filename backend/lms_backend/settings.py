@@ -167,10 +167,10 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # The browsable API is a development aid only
     'DEFAULT_RENDERER_CLASSES': [
         'utils.renderers.DecimalJSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
 }
 
 REST_AUTH_THROTTLE_RATES = {
@@ -1,7 +1,7 @@
 """
 Django settings for LMS Backend project.
 """
-from decouple import config
+from .env import config
 import os
 
 # Determine which environment we're in
@@ -11,6 +11,8 @@ if ENVIRONMENT == 'prod':
     from .prod import *
 elif ENVIRONMENT == 'dev':
     from .dev import *
+elif ENVIRONMENT == 'test':
+    from .test import *
 else:
     from .dev import *  # Default to dev
 
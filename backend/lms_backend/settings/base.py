@@ -4,7 +4,7 @@ Shared settings across all environments.
 """
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from .env import config
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -39,16 +39,18 @@ INSTALLED_APPS = [
     'reports',
 ]
 
-MIDDLEWARE = [
+# Sessions, Django auth and messages are only wired up outside /api/; API views
+# authenticate with JWT (see utils/middleware.py).
+MIDDLEWARE = (
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'utils.middleware.NonApiSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'utils.middleware.NonApiAuthenticationMiddleware',
+    'utils.middleware.NonApiMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
 
 ROOT_URLCONF = 'lms_backend.urls'
 
@@ -80,8 +82,18 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='password'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open across requests instead of reconnecting
+        # (TCP + auth handshake) every time; health checks drop dead ones.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Services manage their own transactions (transaction.atomic)
+        'ATOMIC_REQUESTS': False,
+        # Named cursors don't survive PgBouncer's transaction pooling
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_USE_PGBOUNCER', default=False, cast=bool),
         'OPTIONS': {
             'connect_timeout': 30,
+            # Only takes effect with psycopg 3; ignored by psycopg2
+            'server_side_binding': True,
         },
     }
 }
@@ -131,7 +143,7 @@ REST_FRAMEWORK = {
         'user': '5000/day',
     },
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'utils.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -141,13 +153,33 @@ REST_FRAMEWORK = {
 }
 
 # JWT Settings
+# JWT signing. HS256 (default) signs with SECRET_KEY; the asymmetric
+# algorithms need PEM key files, which are read once here rather than on
+# every token operation. PyJWT[crypto] makes them use cryptography's OpenSSL
+# backend; EdDSA (Ed25519) and ES256 sign far faster than RS256.
+JWT_ASYMMETRIC_ALGORITHMS = ('RS256', 'ES256', 'EdDSA')
+JWT_ALGORITHM = config('JWT_ALGORITHM', default='HS256')
+if JWT_ALGORITHM != 'HS256' and JWT_ALGORITHM not in JWT_ASYMMETRIC_ALGORITHMS:
+    raise ValueError(
+        f"Unsupported JWT_ALGORITHM {JWT_ALGORITHM!r}; "
+        "use 'HS256', 'RS256', 'ES256' or 'EdDSA'."
+    )
+
+if JWT_ALGORITHM in JWT_ASYMMETRIC_ALGORITHMS:
+    JWT_SIGNING_KEY = Path(config('JWT_PRIVATE_KEY_PATH')).read_text()
+    JWT_VERIFYING_KEY = Path(config('JWT_PUBLIC_KEY_PATH')).read_text()
+else:
+    JWT_SIGNING_KEY = SECRET_KEY
+    JWT_VERIFYING_KEY = ''
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'ALGORITHM': 'HS256',
-    'SIGNING_KEY': SECRET_KEY,
+    'ALGORITHM': JWT_ALGORITHM,
+    'SIGNING_KEY': JWT_SIGNING_KEY,
+    'VERIFYING_KEY': JWT_VERIFYING_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
@@ -23,7 +23,7 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # Django Debug Toolbar (optional, install if needed)
 # INSTALLED_APPS += ['debug_toolbar']
-# MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+# MIDDLEWARE += ('debug_toolbar.middleware.DebugToolbarMiddleware',)
 
 # Logging - more verbose in development but avoid noisy autoreload DEBUG logs
 # Keep root logger at INFO to suppress framework debug noise (e.g. autoreload)
@@ -0,0 +1,12 @@
+"""
+Environment configuration shared by the settings modules.
+The .env file is located and parsed once here; every settings module
+reads values through this single `config` instance.
+"""
+from pathlib import Path
+from decouple import Config, RepositoryEmpty, RepositoryEnv
+
+ENV_FILE = Path(__file__).resolve().parent.parent.parent / '.env'
+
+# Environment variables still take precedence over the .env file
+config = Config(RepositoryEnv(ENV_FILE) if ENV_FILE.is_file() else RepositoryEmpty())
@@ -0,0 +1,24 @@
+"""
+Test settings for LMS Backend.
+Used by pytest (see pytest.ini) or: python manage.py test --settings=lms_backend.settings.test --keepdb
+"""
+from .dev import *
+
+# Build the test schema straight from the models instead of replaying every
+# migration. Reusing the database (--reuse-db / --keepdb) skips even that;
+# pass --create-db once after changing models.
+MIGRATION_MODULES = {app.rsplit('.', 1)[-1]: None for app in INSTALLED_APPS}
+
+# Hash strength is irrelevant in tests and the production hashers are slow
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# The apps use no PostgreSQL-only features, so tests default to an in-memory
+# SQLite database (nothing to reuse between runs there). Set
+# TEST_DATABASE=postgres to run against the configured PostgreSQL instead.
+if config('TEST_DATABASE', default='sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
@@ -1,3 +1,43 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Notification
+
+User = get_user_model()
+
+
+class NotificationSaveTests(TestCase):
+    """Test what Notification.save() writes to the database."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='student@test.com', password='TestPass123!', role='student'
+        )
+    
+    def setUp(self):
+        self.notification = Notification.objects.create(
+            user=self.user, title='Title', message='Message', metadata={'course_id': 1}
+        )
+    
+    def test_metadata_changed_in_place_is_stored(self):
+        """Test an in-place metadata edit is saved along with other changes."""
+        notification = Notification.objects.get(pk=self.notification.pk)
+        notification.metadata['seen_on'] = 'web'
+        notification.title = 'New title'
+        notification.save()
+        
+        stored = Notification.objects.get(pk=self.notification.pk)
+        self.assertEqual(stored.metadata, {'course_id': 1, 'seen_on': 'web'})
+        self.assertEqual(stored.title, 'New title')
+    
+    def test_mark_read_sets_read_at(self):
+        """Test marking as read stores is_read and the signal's read_at."""
+        notification = Notification.objects.get(pk=self.notification.pk)
+        notification.is_read = True
+        notification.save()
+        
+        stored = Notification.objects.get(pk=self.notification.pk)
+        self.assertTrue(stored.is_read)
+        self.assertIsNotNone(stored.read_at)
+        self.assertEqual(notification.get_dirty_fields(), {})
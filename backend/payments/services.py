@@ -28,6 +28,12 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+def _session_key(request):
+    """Session key of the request, if any (API requests carry no session)."""
+    session = getattr(request, 'session', None) if request else None
+    return session.session_key if session is not None else None
+
+
 class PaymentService:
     """Service for payment operations."""
     
@@ -616,7 +622,7 @@ class PaymentLogService:
             reason=reason,
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -631,7 +637,7 @@ class PaymentLogService:
             reason=reason,
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -646,7 +652,7 @@ class PaymentLogService:
             transaction=transaction,
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -662,7 +668,7 @@ class PaymentLogService:
             reason=reason,
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -677,7 +683,7 @@ class PaymentLogService:
             metadata={'code': code},
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -692,7 +698,7 @@ class PaymentLogService:
             reason=reason,
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
-            session_id=request.session.session_key if request and request.session else None
+            session_id=_session_key(request)
         )
     
     @staticmethod
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save
+from django.test import TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from .models import CourseStats, Purchase, RechargeCode, Transaction, Wallet
+
+User = get_user_model()
+
+
+class DirtyFieldsModelSaveTests(TestCase):
+    """Test the values DirtyFieldsMixin models store on save()."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='teacher@test.com', password='TestPass123!', role='teacher'
+        )
+        cls.student = User.objects.create_user(
+            email='student@test.com', password='TestPass123!', role='student'
+        )
+        cls.course = Course.objects.create(
+            title='Course', description='Description', instructor=cls.teacher,
+            price=Decimal('100.00')
+        )
+        cls.transaction = Transaction.objects.create(
+            wallet=Wallet.objects.get(student=cls.student),
+            transaction_type=Transaction.TransactionType.PURCHASE,
+            amount=Decimal('-100.00'),
+            description='Purchase'
+        )
+        cls.purchase = Purchase.objects.create(
+            student=cls.student, course=cls.course,
+            amount=Decimal('100.00'), transaction=cls.transaction
+        )
+        cls.code = RechargeCode.objects.create(code='CODE-1', amount=Decimal('50.00'))
+    
+    def test_purchase_save_stores_fields_set_by_save(self):
+        """Test price_at_purchase filled in by Purchase.save() reaches the row."""
+        Purchase.objects.filter(pk=self.purchase.pk).update(price_at_purchase=Decimal('0.00'))
+        purchase = Purchase.objects.get(pk=self.purchase.pk)
+        purchase.refund_reason = 'Changed mind'
+        purchase.save()
+        
+        stored = Purchase.objects.get(pk=self.purchase.pk)
+        self.assertEqual(stored.refund_reason, 'Changed mind')
+        self.assertEqual(stored.price_at_purchase, Decimal('100.00'))
+    
+    def test_recharge_code_save_stores_pre_save_changes(self):
+        """Test fields set by a pre_save receiver reach the row."""
+        expires_at = timezone.now() + timezone.timedelta(days=1)
+        
+        def set_expiry(sender, instance, **kwargs):
+            instance.expires_at = expires_at
+        
+        pre_save.connect(set_expiry, sender=RechargeCode)
+        self.addCleanup(pre_save.disconnect, set_expiry, sender=RechargeCode)
+        
+        code = RechargeCode.objects.get(pk=self.code.pk)
+        code.is_used = True
+        code.used_by = self.student
+        code.used_at = timezone.now()
+        code.save()
+        
+        stored = RechargeCode.objects.get(pk=self.code.pk)
+        self.assertTrue(stored.is_used)
+        self.assertEqual(stored.used_by_id, self.student.pk)
+        self.assertEqual(stored.expires_at, expires_at)
+    
+    def test_course_stats_save_stores_changes_and_timestamp(self):
+        """Test changed counters and the auto_now last_updated are stored."""
+        stats = CourseStats.objects.get(course=self.course)
+        before = stats.last_updated
+        stats.active_students = 7
+        stats.save()
+        
+        stored = CourseStats.objects.get(pk=stats.pk)
+        self.assertEqual(stored.active_students, 7)
+        self.assertGreater(stored.last_updated, before)
@@ -30,8 +30,7 @@ from .serializers import (
     CourseStatsSerializer, PriceHistorySerializer,
     PaymentLogSerializer, InstructorRevenueSerializer,
     StudentActivitySerializer, TopCoursesSerializer,
-    RechargeCodeReportSerializer, RefundReportSerializer,
-    FailedTransactionsReportSerializer, DashboardStatsSerializer
+    DashboardStatsSerializer
 )
 from .services import (
     PaymentService, BulkRechargeService,
@@ -734,8 +733,9 @@ class RechargeCodeReportView(APIView):
         from reports.services import ReportService
         data = ReportService.get_recharge_code_report(start_date, end_date)
         
-        serializer = RechargeCodeReportSerializer(data)
-        return Response(serializer.data)
+        # Aggregates are plain dicts/lists; the Dict/ListField serializer
+        # would only copy them, so return the payload as-is.
+        return Response(data)
 
 
 class RefundReportView(APIView):
@@ -751,8 +751,7 @@ class RefundReportView(APIView):
         from reports.services import ReportService
         data = ReportService.get_refund_report(start_date, end_date)
         
-        serializer = RefundReportSerializer(data)
-        return Response(serializer.data)
+        return Response(data)
 
 
 class FailedTransactionsReportView(APIView):
@@ -768,8 +767,7 @@ class FailedTransactionsReportView(APIView):
         from reports.services import ReportService
         data = ReportService.get_failed_transactions_report(start_date, end_date)
         
-        serializer = FailedTransactionsReportSerializer(data)
-        return Response(serializer.data)
+        return Response(data)
 
 
 # ==================== DASHBOARD & UTILITY VIEWS ====================
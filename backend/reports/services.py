@@ -83,9 +83,9 @@ class ReportService:
         
         # Base queryset
         if student_id:
-            students = User.objects.filter(id=student_id, role='student')
+            students = User.objects.with_profiles().filter(id=student_id, role='student')
         else:
-            students = User.objects.filter(role='student')
+            students = User.objects.with_profiles().filter(role='student')
         
         report_data = []
         
@@ -174,10 +174,11 @@ class ReportService:
             total_amount=Sum('amount')
         ).order_by('-total_amount'))
         
-        # Recent usage
+        # Recent usage (values() below projects only the listed columns,
+        # so there is no need to select_related the full user rows)
         recent_usage = queryset.filter(
             is_used=True
-        ).select_related('used_by', 'created_by').order_by('-used_at')[:20]
+        ).order_by('-used_at')[:20]
         
         return {
             'summary': {
@@ -235,7 +236,7 @@ class ReportService:
 
         for item in student_agg:
             student_id = item.get('student')
-            student = User.objects.filter(id=student_id).first()
+            student = User.objects.with_profiles().filter(id=student_id).first()
             refunds_by_student.append({
                 'student_id': student_id,
                 'student_email': student.email if student else None,
@@ -245,9 +246,7 @@ class ReportService:
             })
         
         # Recent refunds
-        recent_refunds = queryset.select_related(
-            'student', 'course'
-        ).order_by('-refunded_at')[:20]
+        recent_refunds = queryset.order_by('-refunded_at')[:20]
         
         return {
             'summary': {
@@ -277,9 +276,9 @@ class ReportService:
         User = get_user_model()
         
         if instructor_id:
-            instructors = User.objects.filter(id=instructor_id, role='teacher')
+            instructors = User.objects.with_profiles().filter(id=instructor_id, role='teacher')
         else:
-            instructors = User.objects.filter(role='teacher')
+            instructors = User.objects.with_profiles().filter(role='teacher')
         
         report_data = []
         
@@ -369,9 +368,7 @@ class ReportService:
         ).order_by('-count')[:10])
         
         # Recent failed transactions
-        recent_failed = queryset.select_related(
-            'actor', 'student'
-        ).order_by('-created_at')[:20]
+        recent_failed = queryset.order_by('-created_at')[:20]
         
         return {
             'summary': {
@@ -13,10 +13,7 @@ from .services import ReportService
 from .serializers import (
     TopCoursesReportSerializer,
     StudentActivityReportSerializer,
-    RechargeCodeReportSerializer,
-    RefundReportSerializer,
     InstructorRevenueReportSerializer,
-    FailedTransactionsReportSerializer
 )
 
 
@@ -147,8 +144,9 @@ class RechargeCodeReportView(APIView):
         
         data = ReportService.get_recharge_code_report(start_date, end_date)
         
-        serializer = RechargeCodeReportSerializer(data)
-        return Response(serializer.data)
+        # Aggregates are plain dicts/lists; the Dict/ListField serializer
+        # would only copy them, so return the payload as-is.
+        return Response(data)
 
 
 class RefundReportView(APIView):
@@ -162,8 +160,7 @@ class RefundReportView(APIView):
         
         data = ReportService.get_refund_report(start_date, end_date)
         
-        serializer = RefundReportSerializer(data)
-        return Response(serializer.data)
+        return Response(data)
 
 
 class InstructorRevenueReportView(APIView):
@@ -201,8 +198,7 @@ class FailedTransactionsReportView(APIView):
         
         data = ReportService.get_failed_transactions_report(start_date, end_date)
         
-        serializer = FailedTransactionsReportSerializer(data)
-        return Response(serializer.data)
+        return Response(data)
 
 
 class ExportReportView(APIView):
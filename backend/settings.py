@@ -54,18 +54,6 @@ INSTALLED_APPS = [
     'quizzes',
 ]
 
-# ==================== MIDDLEWARE ====================
-
-MIDDLEWARE = [
-    'corsheaders.middleware.CorsMiddleware',  # ?????
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
 # ==================== CORS SETTINGS ====================
 
 # ?? ????? CORS ???????
@@ -74,8 +62,10 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_METHODS = ['*']
 CORS_ALLOW_HEADERS = ['*']
 
+# ==================== MIDDLEWARE ====================
+
 # ??? ?????: ????? CSRF Middleware ??????
-MIDDLEWARE = [
+MIDDLEWARE = (
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,7 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
 
 # ==================== TEMPLATES ====================
 
@@ -144,13 +134,12 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.AllowAny',  # ????? ????? ???????
-    ),
+    # Open by default; an empty tuple skips DRF's per-request AllowAny check
+    'DEFAULT_PERMISSION_CLASSES': (),
+    # The browsable API is a development aid only
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
 }
 
 # ==================== JWT SETTINGS ====================
@@ -1,6 +1,8 @@
 # users/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.utils.html import format_html
 from .models import CustomUser, StudentProfile, TeacherAdminProfile
 
@@ -40,6 +42,12 @@ class BaseProfileAdmin(admin.ModelAdmin):
     raw_id_fields = ('user',)
     readonly_fields = ('created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        # Build the list column in SQL so it can also be sorted on there
+        return super().get_queryset(request).annotate(
+            full_name_db=Concat('first_name', Value(' '), 'last_name')
+        ).select_related('user')
+
 
 @admin.register(StudentProfile)
 class StudentProfileAdmin(BaseProfileAdmin):
@@ -74,9 +82,9 @@ class StudentProfileAdmin(BaseProfileAdmin):
     user_email.admin_order_field = "user__email"
 
     def full_name(self, obj):
-        return f"{obj.first_name} {obj.last_name}"
+        return obj.full_name_db
     full_name.short_description = "Full Name"
-    full_name.admin_order_field = "last_name"
+    full_name.admin_order_field = "full_name_db"
 
 
 @admin.register(TeacherAdminProfile)
@@ -115,6 +123,6 @@ class TeacherAdminProfileAdmin(BaseProfileAdmin):
     user_email.admin_order_field = "user__email"
     
     def full_name(self, obj):
-        return f"{obj.first_name} {obj.last_name}"
+        return obj.full_name_db
     full_name.short_description = "Full Name"
-    full_name.admin_order_field = "last_name"
\ No newline at end of file
+    full_name.admin_order_field = "full_name_db"
\ No newline at end of file
@@ -2,11 +2,16 @@
 Audit logging utility for the LMS platform.
 All apps should use this module to log critical actions.
 """
-from django.db import transaction
+import hashlib
+
 from django.contrib.auth import get_user_model
-from .models import AuditLog
+from django.db import transaction
+from .models import AuditLog, UserAgent
 
-User = get_user_model()
+# Resolve models once at import instead of per call
+USER_MODEL = User = get_user_model()
+AUDIT_LOG_MODEL = AuditLog
+_AUDIT_CREATE = AuditLog.objects.create
 
 
 class AuditLogger:
@@ -21,7 +26,9 @@ class AuditLogger:
         object_type: str = None,
         object_id: int = None,
         metadata: dict = None,
-        request=None
+        request=None,
+        target_email: str = None,
+        amount_cents: int = None
     ) -> AuditLog:
         """
         Log an action to the audit log.
@@ -35,101 +42,225 @@ class AuditLogger:
             object_id: ID of the object affected
             metadata: Additional structured data
             request: Django request object (for IP and user agent)
+            target_email: Email of the affected user (user actions)
+            amount_cents: Amount in cents (payment actions)
         
         Returns:
             AuditLog instance
         """
-        # Extract IP and user agent from request if provided
-        ip_address = None
-        user_agent = None
-        if request:
-            ip_address = get_client_ip(request)
-            user_agent = request.META.get('HTTP_USER_AGENT', '')[:255]
+        # A single INSERT is already atomic; no need for an extra savepoint
+        return _AUDIT_CREATE(**_entry_fields(
+            action_type, description, actor=actor, reason=reason,
+            object_type=object_type, object_id=object_id, metadata=metadata,
+            request=request, target_email=target_email, amount_cents=amount_cents
+        ))
+    
+    @staticmethod
+    def log_many(records: list[dict]) -> list[AuditLog]:
+        """
+        Log several actions at once with a single bulk INSERT.
         
-        with transaction.atomic():
-            log_entry = AuditLog.objects.create(
-                actor=actor if actor and actor.is_authenticated else None,
-                action_type=action_type,
-                description=description,
-                reason=reason,
-                object_type=object_type,
-                object_id=object_id,
-                metadata=metadata or {},
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
+        Args:
+            records: List of dicts of log_action arguments (actor,
+                action_type, description, object_type, object_id, request,
+                ...); ip_address and user_agent may also be given directly
+                when there is no request
         
-        return log_entry
+        Returns:
+            List of AuditLog instances
+        """
+        return AuditLog.objects.bulk_create(
+            [AuditLog(**_entry_fields(**record)) for record in records],
+            batch_size=500
+        )
     
     @staticmethod
     def log_user_action(actor, action_type: str, target_user, description: str, reason: str = None, request=None):
         """Log a user-related action."""
+        if target_user is not None:
+            object_id = target_user.id
+            target_email = target_user.email
+        else:
+            object_id = None
+            target_email = None
+        
         return AuditLogger.log_action(
             actor=actor,
             action_type=action_type,
             description=description,
             reason=reason,
             object_type='User',
-            object_id=target_user.id if target_user else None,
-            metadata={'target_user_email': target_user.email if target_user else None},
-            request=request
+            object_id=object_id,
+            request=request,
+            target_email=target_email
         )
     
     @staticmethod
     def log_course_action(actor, action_type: str, course, description: str, reason: str = None, request=None):
         """Log a course-related action."""
+        if course is not None:
+            object_id = course.id
+            metadata = {'course_title': course.title}
+        else:
+            object_id = None
+            metadata = {'course_title': None}
+        
         return AuditLogger.log_action(
             actor=actor,
             action_type=action_type,
             description=description,
             reason=reason,
             object_type='Course',
-            object_id=course.id if course else None,
-            metadata={'course_title': course.title if course else None},
+            object_id=object_id,
+            metadata=metadata,
             request=request
         )
     
     @staticmethod
     def log_payment_action(actor, action_type: str, transaction, description: str, reason: str = None, request=None):
         """Log a payment-related action."""
+        if transaction is not None:
+            object_id = transaction.id
+            amount_cents = int(transaction.amount * 100)
+            metadata = {'transaction_type': transaction.transaction_type}
+        else:
+            object_id = None
+            amount_cents = None
+            metadata = {'transaction_type': None}
+        
         return AuditLogger.log_action(
             actor=actor,
             action_type=action_type,
             description=description,
             reason=reason,
             object_type='Transaction',
-            object_id=transaction.id if transaction else None,
-            metadata={
-                'amount': str(transaction.amount) if transaction else None,
-                'transaction_type': transaction.transaction_type if transaction else None,
-            },
-            request=request
+            object_id=object_id,
+            metadata=metadata,
+            request=request,
+            amount_cents=amount_cents
         )
     
     @staticmethod
     def log_quiz_action(actor, action_type: str, quiz_attempt, description: str, reason: str = None, request=None):
         """Log a quiz-related action."""
+        object_id = None
+        metadata = None
+        if quiz_attempt is not None:
+            object_id = quiz_attempt.id
+            # quiz_id reads the FK column directly instead of loading the quiz
+            metadata = {
+                'quiz_id': quiz_attempt.quiz_id,
+                'score': str(quiz_attempt.score),
+            }
+        
         return AuditLogger.log_action(
             actor=actor,
             action_type=action_type,
             description=description,
             reason=reason,
             object_type='QuizAttempt',
-            object_id=quiz_attempt.id if quiz_attempt else None,
-            metadata={
-                'quiz_id': quiz_attempt.quiz.id if quiz_attempt and quiz_attempt.quiz else None,
-                'score': str(quiz_attempt.score) if quiz_attempt else None,
-            },
+            object_id=object_id,
+            metadata=metadata,
             request=request
         )
 
 
+def _entry_fields(
+    action_type: str,
+    description: str,
+    actor=None,
+    reason: str = None,
+    object_type: str = None,
+    object_id: int = None,
+    metadata: dict = None,
+    request=None,
+    target_email: str = None,
+    amount_cents: int = None,
+    ip_address: str = None,
+    user_agent: str = None
+) -> dict:
+    """
+    AuditLog field values for one entry, shared by log_action and log_many.
+    
+    Keeps only authenticated actors, takes IP and user agent from the request
+    when there is one, and interns the user agent as a UserAgent id.
+    """
+    if request:
+        ip_address = get_client_ip(request)
+        user_agent = get_user_agent(request)
+    
+    # Resolve the FK ids up front so the ORM skips the descriptor setters
+    return {
+        'actor_id': actor.id if actor is not None and actor.is_authenticated else None,
+        'action_type': action_type,
+        'description': description,
+        'reason': reason,
+        'object_type': object_type,
+        'object_id': object_id,
+        'metadata': metadata if metadata is not None else {},
+        'target_email': target_email,
+        'amount_cents': amount_cents,
+        'ip_address': ip_address,
+        'user_agent_id': get_user_agent_id(user_agent) if user_agent else None,
+    }
+
+
 def get_client_ip(request):
-    """Extract client IP address from request."""
+    """
+    Extract client IP address from request.
+    
+    The result is cached on the request so repeated audit entries written
+    while handling the same request don't re-parse the headers.
+    """
+    ip = getattr(request, '_cached_client_ip', None)
+    if ip is not None:
+        return ip
+    
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        # Only the first hop matters; partition stops at the first comma
+        ip = x_forwarded_for.partition(',')[0].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
+    request._cached_client_ip = ip
     return ip
 
+
+def get_user_agent(request):
+    """Extract the (truncated) user agent from request, cached like get_client_ip."""
+    user_agent = getattr(request, '_cached_ua', None)
+    if user_agent is None:
+        user_agent = request.META.get('HTTP_USER_AGENT', '')[:512]
+        request._cached_ua = user_agent
+    return user_agent
+
+
+# user agent text -> UserAgent id, per process; see get_user_agent_id
+_USER_AGENT_IDS: dict[str, int] = {}
+_USER_AGENT_IDS_MAX = 2048
+
+
+def _remember_user_agent_id(user_agent: str, user_agent_id: int) -> None:
+    if len(_USER_AGENT_IDS) >= _USER_AGENT_IDS_MAX:
+        _USER_AGENT_IDS.clear()
+    _USER_AGENT_IDS[user_agent] = user_agent_id
+
+
+def get_user_agent_id(user_agent: str) -> int:
+    """
+    Return the id of the interned UserAgent row for a user agent string.
+    
+    Ids are cached per process so recurring agents skip the database, but
+    only once the transaction that looked the row up has committed: a row
+    created inside a transaction that rolls back must not stay cached.
+    """
+    try:
+        return _USER_AGENT_IDS[user_agent]
+    except KeyError:
+        pass
+    ua_hash = hashlib.blake2b(user_agent.encode(), digest_size=16).hexdigest()
+    interned, _ = UserAgent.objects.get_or_create(hash=ua_hash, defaults={'text': user_agent})
+    user_agent_id = interned.id
+    # Runs right away outside a transaction
+    transaction.on_commit(lambda: _remember_user_agent_id(user_agent, user_agent_id))
+    return user_agent_id
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_studentprofile_first_name_studentprofile_last_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['actor', 'action_type', '-created_at'], name='users_audit_actor_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(condition=models.Q(('action_type__in', ['wallet_deposit', 'purchase', 'refund'])), fields=['-created_at'], name='users_audit_money_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:50
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def intern_user_agents(apps, schema_editor):
+    AuditLog = apps.get_model('users', 'AuditLog')
+    UserAgent = apps.get_model('users', 'UserAgent')
+    texts = (
+        AuditLog.objects.exclude(user_agent__isnull=True)
+        .exclude(user_agent='')
+        .values_list('user_agent', flat=True)
+        .distinct()
+    )
+    for text in texts.iterator():
+        ua_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        user_agent, _ = UserAgent.objects.get_or_create(hash=ua_hash, defaults={'text': text})
+        AuditLog.objects.filter(user_agent=text).update(user_agent_ref=user_agent)
+
+
+def restore_user_agents(apps, schema_editor):
+    AuditLog = apps.get_model('users', 'AuditLog')
+    UserAgent = apps.get_model('users', 'UserAgent')
+    for user_agent in UserAgent.objects.iterator():
+        AuditLog.objects.filter(user_agent_ref=user_agent).update(user_agent=user_agent.text[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_auditlog_actor_type_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(help_text='blake2b (16 byte) hex digest of the text', max_length=32, unique=True)),
+                ('text', models.CharField(max_length=512)),
+            ],
+            options={
+                'verbose_name': 'User Agent',
+                'verbose_name_plural': 'User Agents',
+            },
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='user_agent_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='audit_logs', to='users.useragent'),
+        ),
+        migrations.RunPython(intern_user_agents, restore_user_agents),
+        migrations.RemoveField(
+            model_name='auditlog',
+            name='user_agent',
+        ),
+        migrations.RenameField(
+            model_name='auditlog',
+            old_name='user_agent_ref',
+            new_name='user_agent',
+        ),
+    ]
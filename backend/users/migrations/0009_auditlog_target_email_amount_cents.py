@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_useragent_auditlog_user_agent_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='amount_cents',
+            field=models.BigIntegerField(blank=True, help_text='Amount of a payment action, in cents', null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='target_email',
+            field=models.EmailField(blank=True, db_index=True, help_text='Email of the user affected by a user action', max_length=254, null=True),
+        ),
+    ]
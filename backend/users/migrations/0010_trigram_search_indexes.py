@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:40
+
+from django.db import migrations
+
+# (index name, table, column) searched with __icontains by the profile list views
+TRIGRAM_INDEXES = [
+    ('users_customuser_email_trgm', 'users_customuser', 'email'),
+    ('users_sp_full_name_trgm', 'users_studentprofile', 'full_name'),
+    ('users_tap_first_name_trgm', 'users_teacheradminprofile', 'first_name'),
+    ('users_tap_last_name_trgm', 'users_teacheradminprofile', 'last_name'),
+    ('users_tap_specialization_trgm', 'users_teacheradminprofile', 'specialization'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm is PostgreSQL only; other backends keep scanning for icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        # icontains compiles to UPPER(col::text) LIKE UPPER(%s), so index that
+        # expression rather than the bare column for the planner to use it
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_auditlog_target_email_amount_cents'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', '-date_joined'], name='users_user_role_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 10:20
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+
+def backfill_columns(apps, schema_editor):
+    """Copy target_email and amount_cents out of the metadata older entries wrote."""
+    AuditLog = apps.get_model('users', 'AuditLog')
+    
+    users = AuditLog.objects.filter(
+        target_email__isnull=True, metadata__has_key='target_user_email'
+    ).only('id', 'metadata')
+    batch = []
+    for log in users.iterator(chunk_size=2000):
+        log.target_email = log.metadata['target_user_email']
+        batch.append(log)
+    AuditLog.objects.bulk_update(batch, ['target_email'], batch_size=500)
+    
+    payments = AuditLog.objects.filter(
+        amount_cents__isnull=True, metadata__has_key='amount'
+    ).only('id', 'metadata')
+    batch = []
+    for log in payments.iterator(chunk_size=2000):
+        try:
+            # Same truncation as AuditLogger.log_payment_action
+            log.amount_cents = int(Decimal(log.metadata['amount']) * 100)
+        except (InvalidOperation, TypeError, ValueError):
+            continue
+        batch.append(log)
+    AuditLog.objects.bulk_update(batch, ['amount_cents'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_customuser_role_joined_idx'),
+    ]
+
+    operations = [
+        # The metadata keys are left in place, so there is nothing to undo
+        migrations.RunPython(backfill_columns, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@
 User models for the LMS platform.
 """
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
 
@@ -34,22 +35,35 @@ class CustomUserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
     
     def get_by_natural_key(self, email):
-        """Retrieve a user by their email (natural key)."""
-        return self.get(email=email)
+        """
+        Retrieve a user by their email (natural key).
+        
+        ModelBackend authenticates through this, so the profiles are joined
+        here and login code can read them without another query.
+        """
+        return self.with_profiles().get(email=email)
+    
+    def with_profiles(self):
+        """Users with their student/teacher profiles joined in the same query."""
+        return self.select_related('student_profile', 'teacher_admin_profile')
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
     """
     Custom user model using email as the unique identifier.
     """
-    ROLE_CHOICES = [
-        ('student', 'Student'),
-        ('teacher', 'Teacher'),
-        ('admin', 'Admin'),
-    ]
+    class Role(models.TextChoices):
+        STUDENT = 'student', 'Student'
+        TEACHER = 'teacher', 'Teacher'
+        ADMIN = 'admin', 'Admin'
+    
+    # Kept for code that still expects the (value, label) list
+    ROLE_CHOICES = Role.choices
+    # value -> label, built once for get_role_display_name and the serializers
+    ROLE_DISPLAY = dict(Role.choices)
     
     email = models.EmailField(unique=True, db_index=True)
-    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    role = models.CharField(max_length=10, choices=Role.choices)
     is_active = models.BooleanField(default=True)
     email_verified = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
@@ -64,26 +78,44 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+        indexes = [
+            # Profile listings filter on role and keep the default ordering
+            models.Index(fields=['role', '-date_joined'], name='users_user_role_joined_idx'),
+        ]
     
     def __str__(self):
         return self.email
     
     def get_role_display_name(self):
         """Get human-readable role name."""
-        return dict(self.ROLE_CHOICES).get(self.role, self.role)
+        return self.ROLE_DISPLAY.get(self.role, self.role)
+    
+    def _get_profile(self, related_name):
+        """
+        Get a related profile or None if it doesn't exist.
+        
+        Reads the value joined by with_profiles() when present; otherwise the
+        descriptor queries once and caches the result (including a miss).
+        """
+        try:
+            return getattr(self, related_name)
+        except ObjectDoesNotExist:
+            return None
     
     def get_full_name(self):
         """Get the full name of the user based on their role and profile."""
-        if self.role == 'student':
-            if hasattr(self, 'student_profile') and self.student_profile:
+        if self.role == self.Role.STUDENT:
+            profile = self._get_profile('student_profile')
+            if profile:
                 # محاولة استخدام first_name + last_name إذا موجودين
-                if self.student_profile.first_name and self.student_profile.last_name:
-                    return f"{self.student_profile.first_name} {self.student_profile.last_name}".strip()
+                if profile.first_name and profile.last_name:
+                    return f"{profile.first_name} {profile.last_name}".strip()
                 # الرجوع إلى full_name إذا لم يكونا موجودين
-                return self.student_profile.full_name
+                return profile.full_name
         else:  # teacher or admin
-            if hasattr(self, 'teacher_admin_profile') and self.teacher_admin_profile:
-                return f"{self.teacher_admin_profile.first_name} {self.teacher_admin_profile.last_name}".strip()
+            profile = self._get_profile('teacher_admin_profile')
+            if profile:
+                return f"{profile.first_name} {profile.last_name}".strip()
         # Fallback to email if no profile exists
         return self.email
 
@@ -114,21 +146,38 @@ class StudentProfile(models.Model):
     def __str__(self):
         return f"{self.full_name} ({self.user.email})"
     
+    _NAME_FIELDS = ('full_name', 'first_name', 'last_name')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_names = instance._name_values()
+        return instance
+
+    def _name_values(self):
+        # __dict__ بدل getattr حتى لا تسبب الحقول المؤجلة (deferred) استعلامات إضافية
+        return tuple(self.__dict__.get(name) for name in self._NAME_FIELDS)
+
     def save(self, *args, **kwargs):
         """Automatically build full_name if first_name and last_name are provided"""
+        # Skip the name juggling on re-saves that did not touch any name field
+        if self._state.adding or self._name_values() != getattr(self, '_loaded_names', None):
+            self._sync_names()
+
+        super().save(*args, **kwargs)
+        self._loaded_names = self._name_values()
+
+    def _sync_names(self):
         if self.first_name and self.last_name and not self.full_name:
-            self.full_name = f"{self.first_name} {self.last_name}".strip()
-        
+            full_name = f"{self.first_name} {self.last_name}"
+            if self.first_name[0].isspace() or self.last_name[-1].isspace():
+                full_name = full_name.strip()
+            self.full_name = full_name
+
         # Also update first_name and last_name from full_name if they're empty
         if self.full_name and (not self.first_name or not self.last_name):
-            parts = self.full_name.split(' ', 1)
-            if len(parts) == 2:
-                self.first_name, self.last_name = parts
-            elif len(parts) == 1:
-                self.first_name = parts[0]
-                self.last_name = ""
-        
-        super().save(*args, **kwargs)
+            first, _, last = self.full_name.partition(' ')
+            self.first_name, self.last_name = first, last
 
 
 class TeacherAdminProfile(models.Model):
@@ -164,6 +213,11 @@ class TeacherAdminProfile(models.Model):
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.user.email})"
+    
+    @property
+    def full_name(self):
+        """First and last name joined with a space."""
+        return f"{self.first_name} {self.last_name}"
 
 
 class WalletReference(models.Model):
@@ -194,6 +248,26 @@ class WalletReference(models.Model):
         return f"Wallet #{self.wallet_id} for {self.user.email}"
 
 
+class UserAgent(models.Model):
+    """
+    Interned user agent strings referenced by AuditLog.
+    Only a few dozen distinct values recur, so each is stored once.
+    """
+    hash = models.CharField(
+        max_length=32,
+        unique=True,
+        help_text='blake2b (16 byte) hex digest of the text'
+    )
+    text = models.CharField(max_length=512)
+    
+    class Meta:
+        verbose_name = 'User Agent'
+        verbose_name_plural = 'User Agents'
+    
+    def __str__(self):
+        return self.text
+
+
 class AuditLog(models.Model):
     """
     Audit log for tracking all critical actions in the system.
@@ -257,8 +331,26 @@ class AuditLog(models.Model):
         blank=True,
         help_text='Additional structured data about the action'
     )
+    # Frequently filtered values get real columns instead of metadata keys
+    target_email = models.EmailField(
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text='Email of the user affected by a user action'
+    )
+    amount_cents = models.BigIntegerField(
+        blank=True,
+        null=True,
+        help_text='Amount of a payment action, in cents'
+    )
     ip_address = models.GenericIPAddressField(blank=True, null=True)
-    user_agent = models.CharField(max_length=255, blank=True, null=True)
+    user_agent = models.ForeignKey(
+        UserAgent,
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+        related_name='audit_logs'
+    )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
     class Meta:
@@ -269,6 +361,14 @@ class AuditLog(models.Model):
             models.Index(fields=['-created_at', 'action_type'], name='users_audit_created_2a3805_idx'),
             models.Index(fields=['actor', '-created_at'], name='users_audit_actor_i_fea760_idx'),
             models.Index(fields=['object_type', 'object_id'], name='users_audit_object__f792c7_idx'),
+            # Admin views filter by actor and action type, newest first
+            models.Index(fields=['actor', 'action_type', '-created_at'], name='users_audit_actor_type_idx'),
+            # Money movements for the payments dashboard
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(action_type__in=['wallet_deposit', 'purchase', 'refund']),
+                name='users_audit_money_idx'
+            ),
         ]
     
     def __str__(self):
@@ -1,38 +1,61 @@
 # users/permissions.py
 from rest_framework import permissions
 
+_STUDENT_TEACHER = frozenset({'student', 'teacher'})
+_TEACHER_ADMIN = frozenset({'teacher', 'admin'})
+
+
+def _user_role(request):
+    """request.user.role, read once and kept on the request for later checks."""
+    role = getattr(request, '_user_role', None)
+    if role is None:
+        role = request._user_role = request.user.role
+    return role
+
 
 class BaseRolePermission(permissions.BasePermission):
     """Base permission class for role-based access control."""
-    allowed_roles = []
+    allowed_roles = frozenset()
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'role') and
-            request.user.role in self.allowed_roles
-        )
+        """
+        Memoized per request: DRF may evaluate the same permission more than
+        once while handling a request. Subclasses override _has_permission.
+        """
+        cache = getattr(request, '_perm_cache', None)
+        if cache is None:
+            cache = request._perm_cache = {}
+        key = (type(self), getattr(view, 'action', None))
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = self._has_permission(request, view)
+            return result
+    
+    def _has_permission(self, request, view):
+        # Anonymous users have no role, but is_authenticated rules them out first
+        user = request.user
+        return bool(user and user.is_authenticated and _user_role(request) in self.allowed_roles)
 
 
 class IsAdminUser(BaseRolePermission):
     """Allows access only to admin users."""
-    allowed_roles = ['admin']
+    allowed_roles = frozenset({'admin'})
 
 
 class IsTeacherUser(BaseRolePermission):
     """Allows access only to teacher users."""
-    allowed_roles = ['teacher']
+    allowed_roles = frozenset({'teacher'})
 
 
 class IsStudentUser(BaseRolePermission):
     """Allows access only to student users."""
-    allowed_roles = ['student']
+    allowed_roles = frozenset({'student'})
 
 
 class IsAdminOrTeacherUser(BaseRolePermission):
     """Allows access to admin and teacher users."""
-    allowed_roles = ['admin', 'teacher']
+    allowed_roles = _TEACHER_ADMIN
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -43,7 +66,7 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # Admins can access anything
-        if request.user.role == 'admin':
+        if _user_role(request) == 'admin':
             return True
         
         # Check if object has a user attribute
@@ -61,7 +84,7 @@ class IsProfileOwnerOrAdmin(IsOwnerOrAdmin):
     def has_permission(self, request, view):
         # Allow list view only for admins
         if view.action == 'list':
-            return request.user.role == 'admin'
+            return _user_role(request) == 'admin'
         return True
     
 
@@ -70,7 +93,7 @@ class CanViewProfiles(BaseRolePermission):
     """
     Permission to view user profiles based on role.
     """
-    def has_permission(self, request, view):
+    def _has_permission(self, request, view):
         # All authenticated users can view profiles
         return request.user and request.user.is_authenticated
     
@@ -79,9 +102,10 @@ class CanViewProfiles(BaseRolePermission):
         Object-level permission for viewing specific user profiles.
         """
         user = request.user
+        role = _user_role(request)
         
         # Admin can view everything
-        if user.role == 'admin':
+        if role == 'admin':
             return True
         
         # Users can always view their own profile
@@ -89,13 +113,13 @@ class CanViewProfiles(BaseRolePermission):
             return True
         
         # Role-based viewing rules
-        if user.role == 'teacher':
+        if role == 'teacher':
             # Teachers can view students and other teachers
-            return obj.role in ['student', 'teacher']
+            return obj.role in _STUDENT_TEACHER
         
-        elif user.role == 'student':
+        elif role == 'student':
             # Students can view teachers and other students
-            return obj.role in ['teacher', 'student']
+            return obj.role in _STUDENT_TEACHER
         
         return False
 
@@ -104,29 +128,29 @@ class CanViewStudentProfiles(BaseRolePermission):
     """
     Permission to view student profiles.
     """
-    def has_permission(self, request, view):
-        if not super().has_permission(request, view):
+    def _has_permission(self, request, view):
+        if not super()._has_permission(request, view):
             return False
         
         # Only teachers and admins can view student lists (SECURITY FIX)
         if view.action == 'list':
-            return request.user.role in ['admin', 'teacher']
+            return _user_role(request) in _TEACHER_ADMIN
         
         return True
     
     def has_object_permission(self, request, view, obj):
-        user = request.user
+        role = _user_role(request)
         
         # Admin can view any student
-        if user.role == 'admin':
+        if role == 'admin':
             return True
         
         # Teachers can view any student
-        if user.role == 'teacher':
+        if role == 'teacher':
             return True
         
         # Students can view other students (individual access only, not list)
-        if user.role == 'student':
+        if role == 'student':
             return True
         
         return False
@@ -136,22 +160,20 @@ class CanViewTeacherProfiles(BaseRolePermission):
     """
     Permission to view teacher profiles.
     """
-    def has_permission(self, request, view):
-        if not super().has_permission(request, view):
+    def _has_permission(self, request, view):
+        if not super()._has_permission(request, view):
             return False
         
         # All authenticated users can view teacher lists
         return True
     
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        
         # Everyone can view teacher profiles
         if obj.role == 'teacher':
             return True
         
         # Only admins can view other admin profiles
         if obj.role == 'admin':
-            return user.role == 'admin'
+            return _user_role(request) == 'admin'
         
         return False
\ No newline at end of file
@@ -1,23 +1,40 @@
 # users/serializers.py
+import re
+
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import RegexValidator
 from .models import CustomUser, StudentProfile, TeacherAdminProfile
 from .services import UserCreationService
 
+_ROLE_CHOICES_TUPLE = tuple(CustomUser.ROLE_CHOICES)
+
+# Compiled once and shared by every serializer that validates phone numbers
+_PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+_PHONE_VALIDATOR = RegexValidator(
+    regex=_PHONE_RE,
+    message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
+)
+
 
 class CustomUserSerializer(serializers.ModelSerializer):
     """Serializer for CustomUser model."""
-    role_display = serializers.CharField(source='get_role_display_name', read_only=True)
     
     class Meta:
         model = CustomUser
         fields = [
-            'id', 'email', 'role', 'role_display', 'is_active', 
+            'id', 'email', 'role', 'is_active', 
             'email_verified', 'last_login', 'date_joined'
         ]
         read_only_fields = ['last_login', 'date_joined']
+    
+    def to_representation(self, instance):
+        """Add role_display with a plain dict lookup."""
+        rep = super().to_representation(instance)
+        rep['role_display'] = CustomUser.ROLE_DISPLAY.get(instance.role, instance.role)
+        return rep
 
 
 class StudentProfileSerializer(serializers.ModelSerializer):
@@ -26,10 +43,7 @@ class StudentProfileSerializer(serializers.ModelSerializer):
     phone = serializers.CharField(
         required=False, 
         allow_null=True,
-        validators=[RegexValidator(
-            regex=r'^\+?1?\d{9,15}$',
-            message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
-        )]
+        validators=[_PHONE_VALIDATOR]
     )
     
     class Meta:
@@ -41,16 +55,12 @@ class StudentProfileSerializer(serializers.ModelSerializer):
 class TeacherAdminProfileSerializer(serializers.ModelSerializer):
     """Serializer for TeacherAdminProfile model."""
     user = CustomUserSerializer(read_only=True)
-    full_name = serializers.SerializerMethodField()
+    full_name = serializers.CharField(read_only=True)
     
     class Meta:
         model = TeacherAdminProfile
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
-    
-    def get_full_name(self, obj):
-        """Get full name from first_name and last_name."""
-        return f"{obj.first_name} {obj.last_name}"
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -76,10 +86,8 @@ class RegisterSerializer(serializers.Serializer):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         
-        # Check email doesn't exist
-        if CustomUser.objects.filter(email=attrs['email']).exists():
-            raise serializers.ValidationError({"email": "A user with this email already exists."})
-        
+        # Duplicate emails are rejected by the unique constraint on insert
+        # (see UserCreationService.create_student_user)
         return attrs
     
     def create(self, validated_data):
@@ -97,6 +105,10 @@ class RegisterSerializer(serializers.Serializer):
                     'grade': validated_data.get('grade', '')
                 }
             )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(
+                e.message_dict if hasattr(e, 'error_dict') else e.messages
+            )
         except Exception as e:
             raise serializers.ValidationError(str(e))
 
@@ -129,6 +141,29 @@ class LoginSerializer(serializers.Serializer):
         raise serializers.ValidationError('Must include "email" and "password".')
 
 
+def _validate_student(attrs):
+    # للطالب: إما full_name أو first_name + last_name
+    if not attrs.get('full_name') and (not attrs.get('first_name') or not attrs.get('last_name')):
+        raise serializers.ValidationError(
+            {"full_name": "Either full_name or both first_name and last_name are required for students."}
+        )
+
+
+def _validate_staff(attrs):
+    # للمعلم والمدير: first_name و last_name مطلوبان
+    if not attrs.get('first_name') or not attrs.get('last_name'):
+        raise serializers.ValidationError(
+            {"first_name": "First and last name are required for teachers/admins."}
+        )
+
+
+_ROLE_VALIDATORS = {
+    'student': _validate_student,
+    'teacher': _validate_staff,
+    'admin': _validate_staff,
+}
+
+
 class AdminCreateUserSerializer(serializers.Serializer):
     """Serializer for admin to create any type of user."""
     email = serializers.EmailField()
@@ -137,7 +172,7 @@ class AdminCreateUserSerializer(serializers.Serializer):
         required=True, 
         validators=[validate_password]
     )
-    role = serializers.ChoiceField(choices=CustomUser.ROLE_CHOICES)
+    role = serializers.ChoiceField(choices=_ROLE_CHOICES_TUPLE)
     is_active = serializers.BooleanField(default=True)
     
     # Conditional profile fields
@@ -146,27 +181,20 @@ class AdminCreateUserSerializer(serializers.Serializer):
     last_name = serializers.CharField(required=False, allow_blank=True)
     
     def validate(self, attrs):
-        role = attrs.get('role')
-        
-        if role == 'student':
-            # للطالب: إما full_name أو first_name + last_name
-            if not attrs.get('full_name') and (not attrs.get('first_name') or not attrs.get('last_name')):
-                raise serializers.ValidationError(
-                    {"full_name": "Either full_name or both first_name and last_name are required for students."}
-                )
-        elif role in ['teacher', 'admin']:
-            # للمعلم والمدير: first_name و last_name مطلوبان
-            if not attrs.get('first_name') or not attrs.get('last_name'):
-                raise serializers.ValidationError(
-                    {"first_name": "First and last name are required for teachers/admins."}
-                )
-        
+        validate_role = _ROLE_VALIDATORS.get(attrs.get('role'))
+        if validate_role is not None:
+            validate_role(attrs)
         return attrs
     
     def create(self, validated_data):
         """Create a user with appropriate profile."""
         try:
-            return UserCreationService.create_user_by_admin(validated_data)
+            # The password field's validators already ran during is_valid()
+            return UserCreationService.create_user_by_admin(validated_data, validate_password=False)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(
+                e.message_dict if hasattr(e, 'error_dict') else e.messages
+            )
         except Exception as e:
             raise serializers.ValidationError(str(e))
         
@@ -176,144 +204,87 @@ class CompleteUserProfileSerializer(serializers.ModelSerializer):
     Complete user profile serializer with all data.
     Shows user info + profile based on role.
     """
-    profile = serializers.SerializerMethodField()
-    full_name = serializers.SerializerMethodField()
-    first_name = serializers.SerializerMethodField()  # إضافة
-    last_name = serializers.SerializerMethodField()   # إضافة
-    phone = serializers.SerializerMethodField()
     
     class Meta:
         model = CustomUser
         fields = [
             'id', 'email', 'role', 'is_active', 'email_verified',
             'last_login', 'date_joined',
-            'profile', 'full_name', 'first_name', 'last_name', 'phone'
         ]
         read_only_fields = fields
     
-    def get_profile(self, obj):
-        """Get profile data based on user role - SAFE version."""
-        try:
-            if obj.role == 'student':
-                try:
-                    profile = StudentProfile.objects.get(user=obj)
-                    return {
-                        'type': 'student',
-                        'full_name': profile.full_name,
-                        'first_name': profile.first_name,
-                        'last_name': profile.last_name,
-                        'phone': profile.phone,
-                        'guardian_phone': profile.guardian_phone,
-                        'grade': profile.grade,
-                        'created_at': profile.created_at,
-                        'updated_at': profile.updated_at
-                    }
-                except StudentProfile.DoesNotExist:
-                    return {'type': 'student', 'exists': False, 'message': 'Profile not created yet'}
-            
-            elif obj.role in ['teacher', 'admin']:
-                try:
-                    profile = TeacherAdminProfile.objects.get(user=obj)
-                    return {
-                        'type': 'teacher_admin',
-                        'first_name': profile.first_name,
-                        'last_name': profile.last_name,
-                        'full_name': f"{profile.first_name} {profile.last_name}",
-                        'date_of_birth': profile.date_of_birth,
-                        'gender': profile.gender,
-                        'specialization': profile.specialization,
-                        'bio': profile.bio,
-                        'phone': profile.phone,
-                        'email': profile.user.email if profile.user else None,
-                        'created_at': profile.created_at,
-                        'updated_at': profile.updated_at
-                    }
-                except TeacherAdminProfile.DoesNotExist:
-                    return {'type': obj.role, 'exists': False, 'message': 'Profile not created yet'}
-            
-            return {'error': 'Unknown role'}
-        except Exception as e:
-            return {'error': str(e)}
-    
-    def get_full_name(self, obj):
-        """Get user's full name from profile - SAFE version."""
-        try:
-            if obj.role == 'student':
-                try:
-                    profile = StudentProfile.objects.get(user=obj)
-                    # استخدام first_name + last_name إذا موجودين
-                    if profile.first_name and profile.last_name:
-                        return f"{profile.first_name} {profile.last_name}"
-                    # الرجوع إلى full_name
-                    return profile.full_name
-                except StudentProfile.DoesNotExist:
-                    return None
-            elif obj.role in ['teacher', 'admin']:
-                try:
-                    profile = TeacherAdminProfile.objects.get(user=obj)
-                    return f"{profile.first_name} {profile.last_name}"
-                except TeacherAdminProfile.DoesNotExist:
-                    return None
-            return None
-        except:
-            return None
-    
-    def get_first_name(self, obj):
-        """Get user's first name from profile - SAFE version."""
-        try:
-            if obj.role == 'student':
-                try:
-                    profile = StudentProfile.objects.get(user=obj)
-                    return profile.first_name
-                except StudentProfile.DoesNotExist:
-                    return None
-            elif obj.role in ['teacher', 'admin']:
-                try:
-                    profile = TeacherAdminProfile.objects.get(user=obj)
-                    return profile.first_name
-                except TeacherAdminProfile.DoesNotExist:
-                    return None
-            return None
-        except:
-            return None
-    
-    def get_last_name(self, obj):
-        """Get user's last name from profile - SAFE version."""
-        try:
-            if obj.role == 'student':
-                try:
-                    profile = StudentProfile.objects.get(user=obj)
-                    return profile.last_name
-                except StudentProfile.DoesNotExist:
-                    return None
-            elif obj.role in ['teacher', 'admin']:
-                try:
-                    profile = TeacherAdminProfile.objects.get(user=obj)
-                    return profile.last_name
-                except TeacherAdminProfile.DoesNotExist:
-                    return None
-            return None
-        except:
-            return None
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Join both profile tables so to_representation doesn't query per user.
+        
+        The password hash is never serialized, so it is not fetched either.
+        """
+        return queryset.select_related(
+            'student_profile', 'teacher_admin_profile'
+        ).defer('password')
     
-    def get_phone(self, obj):
-        """Get user's phone from profile - SAFE version."""
-        try:
-            if obj.role == 'student':
-                try:
-                    profile = StudentProfile.objects.get(user=obj)
-                    return profile.phone
-                except StudentProfile.DoesNotExist:
-                    return None
-            elif obj.role in ['teacher', 'admin']:
-                try:
-                    profile = TeacherAdminProfile.objects.get(user=obj)
-                    return profile.phone
-                except TeacherAdminProfile.DoesNotExist:
-                    return None
-            return None
-        except:
-            return None
+    def to_representation(self, instance):
+        """Add profile, full_name, first_name, last_name and phone from the role's profile."""
+        data = super().to_representation(instance)
+        
+        # Look the profile up once and derive every profile-based field from it.
+        # A missing reverse one-to-one raises an AttributeError subclass, so
+        # getattr's default covers "profile not created yet".
+        profile = None
+        if instance.role == 'student':
+            profile = getattr(instance, 'student_profile', None)
+            if profile is None:
+                data['profile'] = {'type': 'student', 'exists': False, 'message': 'Profile not created yet'}
+            else:
+                data['profile'] = {
+                    'type': 'student',
+                    'full_name': profile.full_name,
+                    'first_name': profile.first_name,
+                    'last_name': profile.last_name,
+                    'phone': profile.phone,
+                    'guardian_phone': profile.guardian_phone,
+                    'grade': profile.grade,
+                    'created_at': profile.created_at,
+                    'updated_at': profile.updated_at
+                }
+        
+        elif instance.role in ['teacher', 'admin']:
+            profile = getattr(instance, 'teacher_admin_profile', None)
+            if profile is None:
+                data['profile'] = {'type': instance.role, 'exists': False, 'message': 'Profile not created yet'}
+            else:
+                data['profile'] = {
+                    'type': 'teacher_admin',
+                    'first_name': profile.first_name,
+                    'last_name': profile.last_name,
+                    'full_name': f"{profile.first_name} {profile.last_name}",
+                    'date_of_birth': profile.date_of_birth,
+                    'gender': profile.gender,
+                    'specialization': profile.specialization,
+                    'bio': profile.bio,
+                    'phone': profile.phone,
+                    'email': instance.email,
+                    'created_at': profile.created_at,
+                    'updated_at': profile.updated_at
+                }
+        
+        else:
+            data['profile'] = {'error': 'Unknown role'}
+        
+        if profile is None:
+            data.update(full_name=None, first_name=None, last_name=None, phone=None)
+            return data
+        
+        # للطالب: الرجوع إلى full_name إذا لم يكن first_name + last_name موجودين
+        if instance.role == 'student' and not (profile.first_name and profile.last_name):
+            data['full_name'] = profile.full_name
+        else:
+            data['full_name'] = f"{profile.first_name} {profile.last_name}"
+        data['first_name'] = profile.first_name
+        data['last_name'] = profile.last_name
+        data['phone'] = profile.phone
+        return data
 
 
 class PublicUserProfileSerializer(serializers.Serializer):
@@ -330,44 +301,69 @@ class PublicUserProfileSerializer(serializers.Serializer):
     last_name = serializers.SerializerMethodField()   # إضافة
     profile_summary = serializers.SerializerMethodField()
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Join both profile tables. Views listing users with this serializer
+        should call it; otherwise every row queries its profile.
+        """
+        return queryset.select_related('student_profile', 'teacher_admin_profile')
+    
+    def _get_profile(self, obj):
+        """
+        The role's profile, or None (reads the select_related cache).
+        
+        Memoized in the serializer context per user, so the four method
+        fields resolve it once per object.
+        """
+        cache = self.context.setdefault('_profile_cache', {})
+        try:
+            return cache[obj.pk]
+        except KeyError:
+            pass
+        if obj.role == 'student':
+            profile = getattr(obj, 'student_profile', None)
+        elif obj.role in ['teacher', 'admin']:
+            profile = getattr(obj, 'teacher_admin_profile', None)
+        else:
+            profile = None
+        cache[obj.pk] = profile
+        return profile
+    
     def get_full_name(self, obj):
         """Get user's full name."""
-        if obj.role == 'student' and hasattr(obj, 'student_profile'):
-            profile = obj.student_profile
-            # استخدام first_name + last_name إذا موجودين
+        profile = self._get_profile(obj)
+        if profile is None:
+            return None
+        if obj.role == 'student':
+            # full_name is kept in sync with first/last name by StudentProfile.save
+            # and ProfileUpdateService, so only build it when the column is empty
+            if profile.full_name:
+                return profile.full_name
             if profile.first_name and profile.last_name:
                 return f"{profile.first_name} {profile.last_name}"
-            return profile.full_name
-        elif obj.role in ['teacher', 'admin'] and hasattr(obj, 'teacher_admin_profile'):
-            profile = obj.teacher_admin_profile
-            return f"{profile.first_name} {profile.last_name}"
-        return None
+            return None
+        return f"{profile.first_name} {profile.last_name}"
     
     def get_first_name(self, obj):
         """Get user's first name."""
-        if obj.role == 'student' and hasattr(obj, 'student_profile'):
-            return obj.student_profile.first_name
-        elif obj.role in ['teacher', 'admin'] and hasattr(obj, 'teacher_admin_profile'):
-            return obj.teacher_admin_profile.first_name
-        return None
+        profile = self._get_profile(obj)
+        return profile.first_name if profile is not None else None
     
     def get_last_name(self, obj):
         """Get user's last name."""
-        if obj.role == 'student' and hasattr(obj, 'student_profile'):
-            return obj.student_profile.last_name
-        elif obj.role in ['teacher', 'admin'] and hasattr(obj, 'teacher_admin_profile'):
-            return obj.teacher_admin_profile.last_name
-        return None
+        profile = self._get_profile(obj)
+        return profile.last_name if profile is not None else None
     
     def get_profile_summary(self, obj):
         """Get profile summary based on role."""
         viewer = self.context.get('request').user
         
         if obj.role == 'student':
-            if not hasattr(obj, 'student_profile'):
+            profile = self._get_profile(obj)
+            if profile is None:
                 return {'type': 'student'}
             
-            profile = obj.student_profile
             summary = {
                 'type': 'student',
                 'grade': profile.grade,
@@ -386,10 +382,10 @@ class PublicUserProfileSerializer(serializers.Serializer):
             return summary
         
         elif obj.role == 'teacher':
-            if not hasattr(obj, 'teacher_admin_profile'):
+            profile = self._get_profile(obj)
+            if profile is None:
                 return {'type': 'teacher'}
             
-            profile = obj.teacher_admin_profile
             summary = {
                 'type': 'teacher',
                 'specialization': profile.specialization,
@@ -401,7 +397,7 @@ class PublicUserProfileSerializer(serializers.Serializer):
             if viewer.role == 'admin':
                 summary.update({
                     'phone': profile.phone,
-                    'email': profile.email,
+                    'email': obj.email,
                     'created_at': profile.created_at
                 })
             
@@ -409,8 +405,8 @@ class PublicUserProfileSerializer(serializers.Serializer):
         
         elif obj.role == 'admin':
             # Admin profiles are only visible to other admins
-            if viewer.role == 'admin' and hasattr(obj, 'teacher_admin_profile'):
-                profile = obj.teacher_admin_profile
+            profile = self._get_profile(obj) if viewer.role == 'admin' else None
+            if profile is not None:
                 return {
                     'type': 'admin',
                     'first_name': profile.first_name,
@@ -5,7 +5,7 @@ Follows Single Responsibility Principle.
 """
 
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.contrib.auth.password_validation import validate_password
 from .models import CustomUser, StudentProfile, TeacherAdminProfile
 
@@ -14,9 +14,11 @@ class UserCreationService:
     """Handles user creation with proper validation and profile creation."""
     
     @classmethod
-    def create_student_user(cls, email: str, password: str, profile_data: dict) -> CustomUser:
+    def create_student_user(cls, email: str, password: str, profile_data: dict,
+                            validate_password: bool = True) -> CustomUser:
         """Create a student user with their profile."""
-        cls._validate_password(password)
+        if validate_password:
+            cls._validate_password(password)
         
         # Handle name fields
         full_name = profile_data.get('full_name', '')
@@ -40,11 +42,7 @@ class UserCreationService:
                 profile_data['last_name'] = ""
         
         with transaction.atomic():
-            user = CustomUser.objects.create_user(
-                email=email,
-                password=password,
-                role='student'
-            )
+            user = cls._build_user(email, password, 'student')
             
             StudentProfile.objects.create(
                 user=user,
@@ -54,9 +52,11 @@ class UserCreationService:
         return user
     
     @classmethod
-    def create_teacher_admin_user(cls, email: str, password: str, role: str, profile_data: dict) -> CustomUser:
+    def create_teacher_admin_user(cls, email: str, password: str, role: str, profile_data: dict,
+                                  validate_password: bool = True) -> CustomUser:
         """Create a teacher or admin user with their profile."""
-        cls._validate_password(password)
+        if validate_password:
+            cls._validate_password(password)
         
         if role not in ['teacher', 'admin']:
             raise ValidationError(f"Invalid role: {role}")
@@ -66,11 +66,7 @@ class UserCreationService:
             raise ValidationError("First name and last name are required for teachers/admins")
         
         with transaction.atomic():
-            user = CustomUser.objects.create_user(
-                email=email,
-                password=password,
-                role=role
-            )
+            user = cls._build_user(email, password, role)
             
             TeacherAdminProfile.objects.create(
                 user=user,
@@ -80,8 +76,13 @@ class UserCreationService:
         return user
     
     @classmethod
-    def create_user_by_admin(cls, user_data: dict) -> CustomUser:
-        """Create any type of user by admin."""
+    def create_user_by_admin(cls, user_data: dict, validate_password: bool = True) -> CustomUser:
+        """
+        Create any type of user by admin.
+        
+        Pass validate_password=False when the password was already validated
+        (e.g. by AdminCreateUserSerializer) to skip running the validators twice.
+        """
         role = user_data.get('role')
         
         if role == 'student':
@@ -95,7 +96,8 @@ class UserCreationService:
                     'phone': user_data.get('phone', ''),
                     'guardian_phone': user_data.get('guardian_phone', ''),
                     'grade': user_data.get('grade', '')
-                }
+                },
+                validate_password=validate_password
             )
         else:
             return cls.create_teacher_admin_user(
@@ -110,9 +112,27 @@ class UserCreationService:
                     'specialization': user_data.get('specialization', ''),
                     'bio': user_data.get('bio', ''),
                     'phone': user_data.get('phone', '')
-                }
+                },
+                validate_password=validate_password
             )
     
+    @staticmethod
+    def _build_user(email: str, password: str, role: str) -> CustomUser:
+        """
+        Insert the user row directly; the caller creates the profile.
+        
+        The unique constraint on email is the duplicate check, so there is no
+        SELECT first. Callers run this inside transaction.atomic(), which the
+        raised ValidationError rolls back.
+        """
+        user = CustomUser(email=CustomUser.objects.normalize_email(email), role=role)
+        user.set_password(password)
+        try:
+            user.save()
+        except IntegrityError:
+            raise ValidationError({'email': 'A user with this email already exists.'})
+        return user
+    
     @staticmethod
     def _validate_password(password: str) -> None:
         """Validate password against Django's validators."""
@@ -128,7 +148,10 @@ class ProfileUpdateService:
         if user.role != 'student':
             raise ValidationError("User is not a student")
         
-        profile = StudentProfile.objects.get(user=user)
+        # Reuse the profile cached on the user (e.g. via select_related)
+        profile = getattr(user, 'student_profile', None)
+        if profile is None:
+            profile = StudentProfile.objects.get(user=user)
         
         # Handle name updates
         if 'first_name' in data or 'last_name' in data:
@@ -137,10 +160,11 @@ class ProfileUpdateService:
             if first_name and last_name:
                 data['full_name'] = f"{first_name} {last_name}".strip()
         
-        for field, value in data.items():
-            if hasattr(profile, field):
-                setattr(profile, field, value)
-        profile.save()
+        touched = ProfileUpdateService._assign_fields(profile, data)
+        # save() may derive the other name fields from the ones that changed
+        if touched & set(StudentProfile._NAME_FIELDS):
+            touched.update(StudentProfile._NAME_FIELDS)
+        profile.save(update_fields=touched)
         return profile
     
     @staticmethod
@@ -149,9 +173,25 @@ class ProfileUpdateService:
         if user.role not in ['teacher', 'admin']:
             raise ValidationError("User is not a teacher or admin")
         
-        profile = TeacherAdminProfile.objects.get(user=user)
+        profile = getattr(user, 'teacher_admin_profile', None)
+        if profile is None:
+            profile = TeacherAdminProfile.objects.get(user=user)
+        touched = ProfileUpdateService._assign_fields(profile, data)
+        profile.save(update_fields=touched)
+        return profile
+    
+    @staticmethod
+    def _assign_fields(profile, data: dict) -> set:
+        """
+        Set the model fields present in data on profile.
+        
+        Returns the names to pass as update_fields so only those columns
+        (plus the auto_now updated_at) are written.
+        """
+        field_names = {f.name for f in profile._meta.concrete_fields}
+        touched = {'updated_at'}
         for field, value in data.items():
-            if hasattr(profile, field):
+            if field in field_names:
                 setattr(profile, field, value)
-        profile.save()
-        return profile
\ No newline at end of file
+                touched.add(field)
+        return touched
\ No newline at end of file
@@ -4,11 +4,15 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.shortcuts import get_object_or_404
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from django.db import models
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator, Page, PageNotAnInteger, EmptyPage
+from django.db import connections, models
+from django.utils.functional import cached_property
 
 from .models import CustomUser, StudentProfile, TeacherAdminProfile
 from .serializers import (
@@ -22,6 +26,114 @@ from .permissions import (
 )
 from .services import ProfileUpdateService
 
+# Joined user columns the profile list serializers never render (the nested
+# CustomUserSerializer shows id, email, role, flags and dates only)
+LIST_DEFERRED_USER_FIELDS = ('user__password', 'user__is_superuser', 'user__is_staff')
+
+# Roles whose profiles each role may see; None means every user. Teachers and
+# students see each other, but not admins
+PROFILE_VISIBLE_ROLES = {
+    'admin': None,
+    'teacher': ('student', 'teacher'),
+    'student': ('student', 'teacher'),
+}
+
+
+class PkSlicePaginator(Paginator):
+    """
+    Paginator that runs the OFFSET over primary keys only.
+    
+    The page's keys are picked in a subquery, so rows skipped by the offset
+    are never joined or read in full; only the page's own rows are.
+    
+    On PostgreSQL an unfiltered listing of a large table is counted from the
+    planner's estimate (pg_class.reltuples) instead of a COUNT(*) scan.
+    """
+    # Below this many (estimated) rows the exact COUNT(*) is cheap enough
+    approximate_count_threshold = 10000
+    count_is_approximate = False
+    
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate >= self.approximate_count_threshold:
+            self.count_is_approximate = True
+            return estimate
+        return super().count
+    
+    def _estimated_count(self):
+        """Row estimate for an unfiltered queryset on PostgreSQL, else None."""
+        queryset = self.object_list
+        if not isinstance(queryset, models.QuerySet) or queryset.query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def validate_number(self, number):
+        if not self._count_is_estimated():
+            return super().validate_number(number)
+        # An estimate may be short of the real count, so it can't bound the
+        # page number; page() raises EmptyPage once the slice comes back empty
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+    
+    def _count_is_estimated(self):
+        self.count  # settles count_is_approximate
+        return self.count_is_approximate
+    
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_is_approximate:
+            return self._estimated_page(number, bottom)
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        page_keys = self.object_list.values('pk')[bottom:top]
+        return self._get_page(self.object_list.filter(pk__in=page_keys), number, self)
+    
+    def _estimated_page(self, number, bottom):
+        # One key past the page tells whether another page follows
+        keys = list(self.object_list.values_list('pk', flat=True)[bottom:bottom + self.per_page + 1])
+        if not keys and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage(self.error_messages['no_results'])
+        page = EstimatedCountPage(self.object_list.filter(pk__in=keys[:self.per_page]), number, self)
+        page.has_more = len(keys) > self.per_page
+        return page
+
+
+class EstimatedCountPage(Page):
+    """Page of a PkSlicePaginator whose count is only an estimate."""
+    has_more = False
+    
+    def has_next(self):
+        # num_pages comes from the estimate; the page's own slice knows better
+        return self.has_more
+
+
+class ProfilePagination(PageNumberPagination):
+    """Page-number pagination for the profile lists (the admin UI pages by number)."""
+    django_paginator_class = PkSlicePaginator
+    page_size = 20
+    # ?page_size= is parsed as a positive int and capped; invalid values fall back to 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -206,65 +318,61 @@ class ProfileUpdateView(APIView):
         """Update user's profile based on their role."""
         user = request.user
         
+        # Only the service's own errors are answered here; anything else
+        # surfaces as a real 500 instead of a generic 400
         try:
             if user.role == 'student':  # Fixed: استخدام string مباشرة بدلاً من CustomUser.Role.STUDENT
                 profile = ProfileUpdateService.update_student_profile(
                     user, request.data
                 )
-                serializer = StudentProfileSerializer(profile)
+                serializer_class = StudentProfileSerializer
             else:
                 profile = ProfileUpdateService.update_teacher_admin_profile(
                     user, request.data
                 )
-                serializer = TeacherAdminProfileSerializer(profile)
-            
-            return Response(serializer.data)
-        except Exception as e:
+                serializer_class = TeacherAdminProfileSerializer
+        except DjangoValidationError as e:
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except (StudentProfile.DoesNotExist, TeacherAdminProfile.DoesNotExist):
+            raise NotFound("Profile not found.")
+        
+        return Response(serializer_class(profile).data)
 
 
 class UserProfilesViewSet(viewsets.GenericViewSet):
     """
     ViewSet for user profiles with role-based access control.
     """
-    permission_classes = [IsOwnerOrAdmin]
+    # Listing the classes replaces the IsAuthenticated default, so restate it:
+    # every action reads request.user.role
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
     
     def get_queryset(self):
         """Get queryset based on user role - optimized version."""
-        user = self.request.user
+        role = self.request.user.role
+        if role not in PROFILE_VISIBLE_ROLES:
+            return CustomUser.objects.none()
         
-        if user.role == 'admin':
-            return CustomUser.objects.all()
-        elif user.role == 'teacher':
-            # Teachers can see all teachers and students (but not other admins)
-            return CustomUser.objects.filter(
-                models.Q(role='student') | models.Q(role='teacher')
-            )
-        elif user.role == 'student':
-            # Students can see teachers and other students
-            return CustomUser.objects.filter(
-                models.Q(role='student') | models.Q(role='teacher')
-            )
+        visible_roles = PROFILE_VISIBLE_ROLES[role]
+        if visible_roles is None:
+            queryset = CustomUser.objects.all()
+        else:
+            queryset = CustomUser.objects.filter(role__in=visible_roles)
         
-        return CustomUser.objects.none()
+        return CompleteUserProfileSerializer.setup_eager_loading(queryset)
     
     @action(detail=False, methods=['get'])
     def my_profile(self, request):
         """Get authenticated user's complete profile."""
         user = request.user
         
-        # تحسين الأداء: جلب البروفايلات في query واحدة
-        if user.role == 'student':
-            try:
-                # جلب المستخدم مع البروفايل في query واحدة
-                user_with_profile = CustomUser.objects.filter(id=user.id).first()
-            except:
-                user_with_profile = user
-        else:
-            user_with_profile = user
+        # تحسين الأداء: جلب المستخدم مع البروفايل في query واحدة
+        user_with_profile = CompleteUserProfileSerializer.setup_eager_loading(
+            CustomUser.objects.filter(id=user.id)
+        ).get()
         
         serializer = CompleteUserProfileSerializer(user_with_profile)
         return Response(serializer.data)
@@ -283,28 +391,18 @@ class UserProfilesViewSet(viewsets.GenericViewSet):
         search = request.query_params.get('search')
         if search:
             # استخدام Q objects للبحث بأمان
-            from django.db.models import Q
-            search_query = Q(email__icontains=search)
-            
-            # إضافة شروط البحث للطلاب
-            student_profiles = StudentProfile.objects.filter(
-                full_name__icontains=search
-            ).values_list('user_id', flat=True)
-            if student_profiles:
-                search_query |= Q(id__in=student_profiles)
-            
-            # إضافة شروط البحث للمعلمين
-            teacher_profiles = TeacherAdminProfile.objects.filter(
-                Q(first_name__icontains=search) | Q(last_name__icontains=search)
-            ).values_list('user_id', flat=True)
-            if teacher_profiles:
-                search_query |= Q(id__in=teacher_profiles)
-            
-            queryset = queryset.filter(search_query)
+            # One query: the profiles are matched through the same joins
+            # select_related already adds. Both are one-to-one, so no
+            # duplicate rows and no need for distinct().
+            queryset = queryset.filter(
+                models.Q(email__icontains=search) |
+                models.Q(student_profile__full_name__icontains=search) |
+                models.Q(teacher_admin_profile__first_name__icontains=search) |
+                models.Q(teacher_admin_profile__last_name__icontains=search)
+            )
         
         # Pagination
-        paginator = PageNumberPagination()
-        paginator.page_size = request.query_params.get('page_size', 20)
+        paginator = ProfilePagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         
         serializer = CompleteUserProfileSerializer(paginated_queryset, many=True)
@@ -313,9 +411,13 @@ class UserProfilesViewSet(viewsets.GenericViewSet):
     @action(detail=True, methods=['get'])
     def profile_detail(self, request, pk=None):
         """Get specific user's profile."""
-        try:
-            user = self.get_queryset().get(id=pk)
-        except CustomUser.DoesNotExist:
+        # Fetch by primary key alone, then apply the same role visibility as
+        # get_queryset; a hidden profile reads as missing
+        visible_roles = PROFILE_VISIBLE_ROLES.get(request.user.role, ())
+        user = CompleteUserProfileSerializer.setup_eager_loading(
+            CustomUser.objects.filter(pk=pk)
+        ).first()
+        if user is None or (visible_roles is not None and user.role not in visible_roles):
             return Response(
                 {"error": "User not found or you don't have permission to view this profile."},
                 status=status.HTTP_404_NOT_FOUND
@@ -337,7 +439,7 @@ class StudentProfilesView(APIView):
         
         if user.role in ['admin', 'teacher']:
             # Admins and teachers can see all students
-            students = StudentProfile.objects.all().select_related('user')
+            students = StudentProfile.objects.all().select_related('user').defer(*LIST_DEFERRED_USER_FIELDS)
         elif user.role == 'student':
             # SECURITY FIX: Students cannot list all student profiles to protect PII
             return Response(
@@ -363,8 +465,7 @@ class StudentProfilesView(APIView):
             )
         
         # Pagination using DRF's pagination
-        paginator = PageNumberPagination()
-        paginator.page_size = request.query_params.get('page_size', 20)
+        paginator = ProfilePagination()
         paginated_students = paginator.paginate_queryset(students, request)
         
         serializer = StudentProfileSerializer(paginated_students, many=True)
@@ -386,11 +487,11 @@ class TeacherProfilesView(APIView):
         if user.role == 'admin':
             teachers = TeacherAdminProfile.objects.filter(
                 models.Q(user__role='teacher') | models.Q(user__role='admin')
-            ).select_related('user')
+            ).select_related('user').defer(*LIST_DEFERRED_USER_FIELDS)
         else:
             teachers = TeacherAdminProfile.objects.filter(
                 user__role='teacher'
-            ).select_related('user')
+            ).select_related('user').defer(*LIST_DEFERRED_USER_FIELDS)
         
         # Apply filters
         specialization = request.query_params.get('specialization')
@@ -407,8 +508,7 @@ class TeacherProfilesView(APIView):
             )
         
         # Pagination using DRF's pagination
-        paginator = PageNumberPagination()
-        paginator.page_size = request.query_params.get('page_size', 20)
+        paginator = ProfilePagination()
         paginated_teachers = paginator.paginate_queryset(teachers, request)
         
         serializer = TeacherAdminProfileSerializer(paginated_teachers, many=True)
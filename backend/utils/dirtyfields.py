@@ -5,35 +5,60 @@ This small helper avoids adding an external dependency while providing the
 """
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Tuple
+
+from django.db.models import DEFERRED
+
+# model class -> ((name, attname), ...) of its fields, built once per class
+_FIELD_NAMES_CACHE: Dict[type, Tuple[Tuple[str, str], ...]] = {}
+
+
+def _tracked_fields(model: type) -> Tuple[Tuple[str, str], ...]:
+    try:
+        return _FIELD_NAMES_CACHE[model]
+    except KeyError:
+        fields = _FIELD_NAMES_CACHE[model] = tuple(
+            (f.name, f.attname) for f in model._meta.concrete_fields
+        )
+        return fields
 
 
 class DirtyFieldsMixin:
     """Track original field values and report changed fields.
 
     Works by recording field values at initialization and refreshing after save.
+    Foreign keys are tracked by their raw id (``attname``), so taking a
+    snapshot never loads related objects.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if (args and not kwargs and len(args) == len(_tracked_fields(type(self)))
+                and not any(value is DEFERRED for value in args)):
+            # Model.from_db builds loaded rows positionally, in field order:
+            # the args are the snapshot already, no need to read them back
+            self._original_state = args
+        else:
+            self._snapshot()
+
+    def _field_values(self) -> tuple:
+        return tuple([getattr(self, attname) for _, attname in _tracked_fields(type(self))])
+
+    def _snapshot(self) -> None:
         try:
-            self._original_state = {f.name: getattr(self, f.name) for f in self._meta.fields}
+            self._original_state = self._field_values()
         except Exception:
-            self._original_state = {}
+            # Unknown originals compare as None, like a missing key did before
+            self._original_state = (None,) * len(_tracked_fields(type(self)))
 
     def get_dirty_fields(self) -> Dict[str, Dict[str, object]]:
-        dirty = {}
-        for f in getattr(self, '_meta').fields:
-            name = f.name
-            old = self._original_state.get(name, None)
-            new = getattr(self, name)
-            if old != new:
-                dirty[name] = {'old': old, 'new': new}
-        return dirty
+        fields = _tracked_fields(type(self))
+        return {
+            name: {'old': old, 'new': new}
+            for (name, _), old, new in zip(fields, self._original_state, self._field_values())
+            if old != new
+        }
 
     def save(self, *args, **kwargs):
         result = super().save(*args, **kwargs)
-        try:
-            self._original_state = {f.name: getattr(self, f.name) for f in self._meta.fields}
-        except Exception:
-            self._original_state = {}
+        self._snapshot()
         return result
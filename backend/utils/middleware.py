@@ -0,0 +1,44 @@
+"""Session/auth/messages middleware variants that stay out of the API request path.
+
+API endpoints authenticate with JWT through DRF, so they never need the
+session store or Django's lazy ``request.user``. The admin and other
+non-API paths keep the stock behaviour.
+"""
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+
+API_PATH_PREFIX = '/api/'
+
+
+def is_api_request(request) -> bool:
+    return request.path_info.startswith(API_PATH_PREFIX)
+
+
+class NonApiSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware that skips requests under ``API_PATH_PREFIX``."""
+
+    def process_request(self, request):
+        if not is_api_request(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if is_api_request(request):
+            return response
+        return super().process_response(request, response)
+
+
+class NonApiAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that leaves API requests to JWTAuthentication."""
+
+    def process_request(self, request):
+        if not is_api_request(request):
+            super().process_request(request)
+
+
+class NonApiMessageMiddleware(MessageMiddleware):
+    """MessageMiddleware for non-API requests; its storage needs the session."""
+
+    def process_request(self, request):
+        if not is_api_request(request):
+            super().process_request(request)
@@ -1,13 +1,57 @@
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
 from django.core.serializers.json import DjangoJSONEncoder
 import json
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to DRF's json renderer
+    orjson = None
+
 
 class DecimalJSONRenderer(JSONRenderer):
-    """JSON renderer that uses DjangoJSONEncoder to handle Decimal and other types."""
+    """JSON renderer that uses DjangoJSONEncoder to handle Decimal and other types.
+
+    Encodes with orjson when it is installed; dates and times are passed
+    through to DjangoJSONEncoder so they keep its format.
+    """
+
+    _default = staticmethod(DjangoJSONEncoder().default)
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         if data is None:
             return super().render(data, accepted_media_type, renderer_context)
+        if orjson is not None:
+            return orjson.dumps(
+                data,
+                default=self._default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
         # Use DjangoJSONEncoder to handle Decimal, QuerySets etc.
         return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson, producing the same output as DRF's.
+
+    Types orjson doesn't know (Decimal, lazy strings, QuerySets, ...) go
+    through DRF's JSONEncoder.default, so payloads render as they did with
+    the stock renderer. Without orjson installed it behaves exactly like
+    JSONRenderer.
+    """
+
+    _default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=self._default, option=option)
+        # Same escaping as JSONRenderer so the output stays a JavaScript subset
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
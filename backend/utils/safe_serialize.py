@@ -1,33 +1,113 @@
 from decimal import Decimal
 from datetime import date, datetime
-from collections.abc import Mapping, Iterable
+from collections.abc import Mapping
+
+# Exact types converted in one step, looked up by type(obj) before any isinstance check
+_CONVERTERS = {
+    Decimal: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+_LEAVES = frozenset({str, int, float, bool, bytes, type(None)})
+
+# Stack marker: a container's children are done
+_EXIT = object()
+
+
+def _expand(obj, obj_type):
+    """Return (result, children, build) for a value that isn't an exact leaf type.
+
+    children is None when result is already the converted value; otherwise
+    result is the container the converted (key, child) pairs are stored into,
+    and build (if set) turns the filled list into the final tuple/set.
+    """
+    if obj_type is dict:
+        return {}, obj.items(), None
+    if obj_type is list:
+        return [None] * len(obj), enumerate(obj), None
+    if isinstance(obj, Decimal):
+        return str(obj), None, None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat(), None, None
+    if isinstance(obj, Mapping):
+        return {}, obj.items(), None
+    if isinstance(obj, list):
+        return [None] * len(obj), enumerate(obj), None
+    if isinstance(obj, (tuple, set)):
+        return [None] * len(obj), enumerate(obj), obj_type
+    # Fallback for objects with __dict__ (models, simple objects)
+    if hasattr(obj, "__dict__"):
+        return {}, obj.__dict__.items(), None
+    return obj, None, None
 
 
 def _convert(obj):
-    """Recursively convert Decimals to strings and datetimes to ISO strings.
+    """Convert Decimals to strings and datetimes to ISO strings.
 
-    Handles dict, list, tuple, set, and objects with __dict__ by recursing.
-    Does NOT convert floats.
+    Handles dict, list, tuple, set, and objects with __dict__ by walking into
+    them with an explicit stack rather than recursion. Does NOT convert floats.
+    A value that can't be converted, or that contains itself, becomes its
+    string representation.
     """
-    try:
-        if obj is None:
-            return None
-        if isinstance(obj, Decimal):
-            return str(obj)
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        if isinstance(obj, Mapping):
-            return {k: _convert(v) for k, v in obj.items()}
-        if isinstance(obj, (list, tuple, set)):
-            converted = [_convert(v) for v in obj]
-            return type(obj)(converted) if not isinstance(obj, list) else converted
-        # Fallback for objects with __dict__ (models, simple objects)
-        if hasattr(obj, "__dict__"):
-            return _convert(obj.__dict__)
-        return obj
-    except Exception:
-        # Conservative fallback: string representation
-        return str(obj)
+    root = [None]
+    stack = [(root, 0, obj)]
+    path = set()  # ids of the containers being walked, to stop on cycles
+    while stack:
+        target, key, value = stack.pop()
+        if target is _EXIT:
+            path.discard(key)
+            if value is not None:
+                target, key, original, items, build = value
+                try:
+                    target[key] = build(items)
+                except Exception:
+                    target[key] = str(original)
+            continue
+
+        value_type = type(value)
+        if value_type in _LEAVES:
+            target[key] = value
+            continue
+        convert = _CONVERTERS.get(value_type)
+        if convert is not None:
+            target[key] = convert(value)
+            continue
+        if id(value) in path:
+            target[key] = str(value)
+            continue
+
+        try:
+            result, children, build = _expand(value, value_type)
+            if children is not None:
+                children = list(children)
+        except Exception:
+            # Conservative fallback: string representation
+            target[key] = str(value)
+            continue
+        if children is None:
+            target[key] = result
+            continue
+
+        path.add(id(value))
+        if build is None:
+            target[key] = result
+            stack.append((_EXIT, id(value), None))
+        else:
+            stack.append((_EXIT, id(value), (target, key, value, result, build)))
+        # Leaves are stored right away; only nested values go on the stack.
+        # Storing a placeholder first keeps dict keys in their original order.
+        for k, v in children:
+            child_type = type(v)
+            if child_type in _LEAVES:
+                result[k] = v
+                continue
+            convert = _CONVERTERS.get(child_type)
+            if convert is not None:
+                result[k] = convert(v)
+            else:
+                result[k] = None
+                stack.append((result, k, v))
+    return root[0]
 
 
 def convert_decimals(obj):
@@ -40,4 +120,7 @@ def convert_decimals(obj):
     Intended use only in Signals, Background tasks (Celery), Webhooks, and Logging.
     Do NOT use this in normal DRF Views that should return `serializer.data`.
     """
-    return _convert(obj)
+    try:
+        return _convert(obj)
+    except Exception:
+        return str(obj)